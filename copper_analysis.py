@@ -7,14 +7,20 @@ GitHub Repository Version
 
 import pandas as pd
 import numpy as np
+from scipy.signal import find_peaks
 from datetime import datetime, timedelta
 import json
+import hashlib
 import warnings
-import schedule
-import time
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 warnings.filterwarnings('ignore')
 
@@ -23,11 +29,24 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / 'data'
 OUTPUT_DIR = BASE_DIR / 'output'
 BACKUP_DIR = OUTPUT_DIR / 'backups'
+RESULTS_CACHE_DIR = OUTPUT_DIR / 'cache'
+CACHE_PATH = DATA_DIR / 'cache.parquet'
+CACHE_META_PATH = DATA_DIR / 'cache.meta'
+CACHE_VERSION = 3  # Bump when the preprocessed columns, dtypes or result layout change
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 BACKUP_DIR.mkdir(exist_ok=True)
+RESULTS_CACHE_DIR.mkdir(exist_ok=True)
+
+# Name lookups used when serializing results
+MONTH_NAMES = np.array(['January', 'February', 'March', 'April', 'May', 'June',
+                        'July', 'August', 'September', 'October', 'November', 'December'])
+WEEKDAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
+# Date formats accepted in the CSV, tried in order against the first row
+DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d')
 
 class CopperLMEAnalyzer:
     def __init__(self, csv_filename='lme_copper_historical_data.csv'):
@@ -39,27 +58,48 @@ class CopperLMEAnalyzer:
     def load_data(self):
         """Load and preprocess the CSV data"""
         try:
-            # Read CSV
-            self.df = pd.read_csv(self.csv_path)
+            # Reuse the preprocessed frame if the CSV hasn't changed since it was cached
+            csv_mtime = self.csv_path.stat().st_mtime
+            if self._load_cache(csv_mtime):
+                print(f"Data loaded from cache: {len(self.df)} records from {self.df['date'].min().date()} to {self.df['date'].max().date()}")
+                return True
+            
+            # Read only the columns we analyze; float32 is ample for $/ton prices
+            self.df = pd.read_csv(
+                self.csv_path,
+                usecols=['date', 'lme_copper_cash_settlement'],
+                dtype={'lme_copper_cash_settlement': np.float32},
+                engine='c'
+            )
             
             # Parse dates with multiple format support
-            self.df['date'] = pd.to_datetime(self.df['date'], errors='coerce', dayfirst=False)
+            self.df['date'] = self._parse_dates(self.df['date'])
             
             # Sort by date
             self.df = self.df.sort_values('date')
             
-            # Remove rows with null cash settlement values
-            self.df = self.df[self.df['lme_copper_cash_settlement'].notna()]
+            # Remove rows with null dates or cash settlement values
+            self.df = self.df.dropna(subset=['date', 'lme_copper_cash_settlement'])
+            
+            # Trend and volatility analyses rely on this order rather than re-sorting
+            assert self.df['date'].is_monotonic_increasing
+            
+            # Add time-based features as compact integer columns
+            self.df['year'] = self.df['date'].dt.year.astype(np.int16)
+            self.df['month'] = self.df['date'].dt.month.astype(np.int8)
+            self.df['day'] = self.df['date'].dt.day.astype(np.int8)
+            self.df['weekday'] = self.df['date'].dt.dayofweek.astype(np.int8)
+            # Week of month (1-5): offset the day by the weekday of the 1st, which
+            # is recoverable from the row's own weekday without a per-row apply
+            first_weekday = (self.df['weekday'] - self.df['day'] + 1) % 7
+            self.df['week_of_month'] = (self.df['day'] + first_weekday - 1) // 7 + 1
+            self.df['quarter'] = self.df['date'].dt.quarter.astype(np.int8)
+            
+            # Packed (year, month) key: grouping on one int32 column avoids tuple hashing.
+            # Months run 1-12, so divmod(ym, 13) recovers (year, month)
+            self.df['ym'] = self.df['year'].astype(np.int32) * 13 + self.df['month'].astype(np.int32)
             
-            # Add time-based features
-            self.df['year'] = self.df['date'].dt.year
-            self.df['month'] = self.df['date'].dt.month
-            self.df['month_name'] = self.df['date'].dt.strftime('%B')
-            self.df['day'] = self.df['date'].dt.day
-            self.df['weekday'] = self.df['date'].dt.dayofweek
-            self.df['weekday_name'] = self.df['date'].dt.strftime('%A')
-            self.df['week_of_month'] = self.df['date'].apply(self._get_week_of_month)
-            self.df['quarter'] = self.df['date'].dt.quarter
+            self._save_cache(csv_mtime)
             
             print(f"Data loaded successfully: {len(self.df)} records from {self.df['date'].min().date()} to {self.df['date'].max().date()}")
             return True
@@ -68,11 +108,39 @@ class CopperLMEAnalyzer:
             print(f"Error loading data: {e}")
             return False
     
-    def _get_week_of_month(self, date):
-        """Calculate week of month (1-5)"""
-        first_day = date.replace(day=1)
-        adjusted_day = date.day + first_day.weekday()
-        return (adjusted_day - 1) // 7 + 1
+    def _parse_dates(self, dates):
+        """Parse dates with the format detected from the first value, falling back to inference"""
+        first = dates.dropna().iloc[0] if dates.notna().any() else None
+        for date_format in DATE_FORMATS:
+            try:
+                datetime.strptime(str(first), date_format)
+            except ValueError:
+                continue
+            return pd.to_datetime(dates, format=date_format, errors='coerce')
+        
+        return pd.to_datetime(dates, errors='coerce', dayfirst=False, cache=True)
+    
+    def _load_cache(self, csv_mtime):
+        """Load the parquet cache if it was built from the current CSV"""
+        try:
+            meta = json.loads(CACHE_META_PATH.read_text())
+            if (meta.get('version') != CACHE_VERSION or meta['source'] != str(self.csv_path)
+                    or meta['csv_mtime'] != csv_mtime):
+                return False
+            self.df = pd.read_parquet(CACHE_PATH)
+            return self.df['date'].is_monotonic_increasing
+        except Exception:
+            return False
+    
+    def _save_cache(self, csv_mtime):
+        """Persist the preprocessed data to parquet (requires pyarrow)"""
+        try:
+            self.df.to_parquet(CACHE_PATH, compression='zstd')
+            CACHE_META_PATH.write_text(json.dumps({
+                'version': CACHE_VERSION, 'source': str(self.csv_path), 'csv_mtime': csv_mtime
+            }))
+        except Exception as e:
+            print(f"Data cache not written: {e}")
     
     def analyze_period(self, start_date=None, end_date=None):
         """Analyze data for a specific period"""
@@ -86,12 +154,25 @@ class CopperLMEAnalyzer:
         else:
             end_date = pd.to_datetime(end_date)
         
-        # Filter data for the period
-        period_df = self.df[(self.df['date'] >= start_date) & (self.df['date'] <= end_date)].copy()
+        # Identical reruns against an unchanged CSV reuse the stored results
+        cache_path = self._results_cache_path(start_date, end_date)
+        if cache_path.exists():
+            try:
+                return json.loads(cache_path.read_text())
+            except ValueError:
+                pass
+        
+        # Filter data for the period; the positional index lets group idxmax/idxmin
+        # results be used directly as array offsets
+        period_df = self.df[(self.df['date'] >= start_date) & (self.df['date'] <= end_date)].reset_index(drop=True)
         
         if len(period_df) == 0:
             return {"error": "No data available for the selected period"}
         
+        # Monthly average broadcast to every row, shared by all sub-analyses
+        period_df['month_avg'] = period_df.groupby('ym')['lme_copper_cash_settlement'].transform('mean')
+        period_df['above_month_avg'] = (period_df['lme_copper_cash_settlement'] > period_df['month_avg']).astype(np.int8)
+        
         results = {
             "period": {
                 "start": start_date.strftime('%Y-%m-%d'),
@@ -100,29 +181,54 @@ class CopperLMEAnalyzer:
             }
         }
         
-        # Overall statistics
-        results["overall_stats"] = self._calculate_overall_stats(period_df)
-        
-        # Monthly analysis
-        results["monthly_analysis"] = self._analyze_monthly_patterns(period_df)
-        
-        # Weekly patterns within month
-        results["weekly_patterns"] = self._analyze_weekly_patterns(period_df)
-        
-        # Best day of week analysis
-        results["weekday_analysis"] = self._analyze_weekday_patterns(period_df)
-        
-        # Pricing strategy recommendations
-        results["pricing_strategy"] = self._calculate_pricing_strategy(period_df)
+        analyses = {
+            # Overall statistics
+            "overall_stats": self._calculate_overall_stats,
+            # Monthly analysis
+            "monthly_analysis": self._analyze_monthly_patterns,
+            # Weekly patterns within month
+            "weekly_patterns": self._analyze_weekly_patterns,
+            # Best day of week analysis
+            "weekday_analysis": self._analyze_weekday_patterns,
+            # Pricing strategy recommendations
+            "pricing_strategy": self._calculate_pricing_strategy,
+            # Trend and seasonality
+            "trends": self._analyze_trends,
+            # Volatility analysis
+            "volatility": self._analyze_volatility
+        }
         
-        # Trend and seasonality
-        results["trends"] = self._analyze_trends(period_df)
+        # The analyses only read period_df, so they can overlap; pandas releases
+        # the GIL inside most of its aggregations
+        with ThreadPoolExecutor(max_workers=len(analyses)) as executor:
+            futures = {name: executor.submit(analysis, period_df) for name, analysis in analyses.items()}
+            results.update({name: future.result() for name, future in futures.items()})
         
-        # Volatility analysis
-        results["volatility"] = self._analyze_volatility(period_df)
+        self._save_results_cache(cache_path, results)
         
         return results
     
+    def _results_cache_path(self, start_date, end_date):
+        """Cache file for a period's results, named analysis_<source>_<generation>_<period>.json"""
+        source = hashlib.sha1(str(self.csv_path).encode()).hexdigest()[:12]
+        generation = f"v{CACHE_VERSION}-{self.csv_path.stat().st_mtime_ns}"
+        period = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
+        return RESULTS_CACHE_DIR / f"analysis_{source}_{generation}_{period}.json"
+    
+    def _save_results_cache(self, cache_path, results):
+        """Store a period's results, dropping entries cached from older versions of the same CSV"""
+        source_prefix = '_'.join(cache_path.name.split('_')[:2]) + '_'
+        generation_prefix = cache_path.name.rsplit('_', 1)[0] + '_'
+        try:
+            for entry in RESULTS_CACHE_DIR.glob(f"{source_prefix}*.json"):
+                if not entry.name.startswith(generation_prefix):
+                    entry.unlink()
+            
+            # Plain json keeps NaN/inf so cached results match a fresh run exactly
+            cache_path.write_text(json.dumps(results, default=str))
+        except OSError as e:
+            print(f"Results cache not written: {e}")
+    
     def _calculate_overall_stats(self, df):
         """Calculate overall statistics"""
         return {
@@ -138,42 +244,54 @@ class CopperLMEAnalyzer:
         """Analyze monthly patterns and compare daily rates to monthly averages"""
         monthly_stats = []
         
-        for (year, month), month_df in df.groupby(['year', 'month']):
-            month_avg = month_df['lme_copper_cash_settlement'].mean()
-            
-            # Calculate how many days beat the monthly average
-            days_above_avg = (month_df['lme_copper_cash_settlement'] > month_avg).sum()
-            days_below_avg = (month_df['lme_copper_cash_settlement'] <= month_avg).sum()
-            
-            # Best and worst days in the month
-            best_day = month_df.loc[month_df['lme_copper_cash_settlement'].idxmax()]
-            worst_day = month_df.loc[month_df['lme_copper_cash_settlement'].idxmin()]
-            
+        # One aggregation pass over all months
+        monthly = df.groupby('ym').agg(
+            average=('lme_copper_cash_settlement', 'mean'),
+            min=('lme_copper_cash_settlement', 'min'),
+            max=('lme_copper_cash_settlement', 'max'),
+            std=('lme_copper_cash_settlement', 'std'),
+            trading_days=('lme_copper_cash_settlement', 'count'),
+            days_above=('above_month_avg', 'sum'),
+            best_idx=('lme_copper_cash_settlement', 'idxmax'),
+            worst_idx=('lme_copper_cash_settlement', 'idxmin')
+        )
+        
+        # Best and worst days in each month, gathered by position in bulk
+        prices = df['lme_copper_cash_settlement'].to_numpy()
+        best_idx = monthly['best_idx'].to_numpy()
+        worst_idx = monthly['worst_idx'].to_numpy()
+        best_dates = df['date'].iloc[best_idx].dt.strftime('%Y-%m-%d')
+        worst_dates = df['date'].iloc[worst_idx].dt.strftime('%Y-%m-%d')
+        
+        for ym, row, best_date, best_value, worst_date, worst_value in zip(
+                monthly.index, monthly.itertuples(index=False),
+                best_dates, prices[best_idx], worst_dates, prices[worst_idx]):
+            year, month = divmod(int(ym), 13)
             monthly_stats.append({
                 "year": int(year),
                 "month": int(month),
-                "month_name": month_df['month_name'].iloc[0],
-                "average": float(month_avg),
-                "min": float(month_df['lme_copper_cash_settlement'].min()),
-                "max": float(month_df['lme_copper_cash_settlement'].max()),
-                "std": float(month_df['lme_copper_cash_settlement'].std()),
-                "days_above_average": int(days_above_avg),
-                "days_below_average": int(days_below_avg),
+                "month_name": MONTH_NAMES[month - 1],
+                "average": float(row.average),
+                "min": float(row.min),
+                "max": float(row.max),
+                "std": float(row.std),
+                "days_above_average": int(row.days_above),
+                "days_below_average": int(row.trading_days - row.days_above),
                 "best_day": {
-                    "date": best_day['date'].strftime('%Y-%m-%d'),
-                    "value": float(best_day['lme_copper_cash_settlement']),
-                    "premium_to_avg": float(best_day['lme_copper_cash_settlement'] - month_avg)
+                    "date": best_date,
+                    "value": float(best_value),
+                    "premium_to_avg": float(best_value - row.average)
                 },
                 "worst_day": {
-                    "date": worst_day['date'].strftime('%Y-%m-%d'),
-                    "value": float(worst_day['lme_copper_cash_settlement']),
-                    "discount_to_avg": float(month_avg - worst_day['lme_copper_cash_settlement'])
+                    "date": worst_date,
+                    "value": float(worst_value),
+                    "discount_to_avg": float(row.average - worst_value)
                 }
             })
         
         # Calculate month-of-year seasonality
         month_seasonality = df.groupby('month')['lme_copper_cash_settlement'].agg(['mean', 'std']).reset_index()
-        month_seasonality['month_name'] = month_seasonality['month'].apply(lambda x: pd.Timestamp(2024, x, 1).strftime('%B'))
+        month_seasonality['month_name'] = MONTH_NAMES[month_seasonality['month'].values - 1]
         
         return {
             "monthly_details": monthly_stats,
@@ -185,23 +303,20 @@ class CopperLMEAnalyzer:
         weekly_stats = []
         
         for week in range(1, 6):
-            week_df = df[df['week_of_month'] == week]
+            week_mask = df['week_of_month'] == week
+            week_df = df[week_mask]
             if len(week_df) > 0:
                 # Calculate performance vs monthly average
-                performance_vs_month = []
-                for (year, month), group in week_df.groupby(['year', 'month']):
-                    month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-                    week_avg = group['lme_copper_cash_settlement'].mean()
-                    performance_vs_month.append((week_avg / month_avg - 1) * 100)
+                performance_vs_month = self._performance_vs_month(df, week_mask)
                 
                 weekly_stats.append({
                     "week": f"Week {week}",
                     "avg_price": float(week_df['lme_copper_cash_settlement'].mean()),
                     "std": float(week_df['lme_copper_cash_settlement'].std()),
                     "count": len(week_df),
-                    "avg_performance_vs_month": float(np.mean(performance_vs_month)) if performance_vs_month else 0,
-                    "best_performance": float(np.max(performance_vs_month)) if performance_vs_month else 0,
-                    "worst_performance": float(np.min(performance_vs_month)) if performance_vs_month else 0
+                    "avg_performance_vs_month": float(performance_vs_month.mean()),
+                    "best_performance": float(performance_vs_month.max()),
+                    "worst_performance": float(performance_vs_month.min())
                 })
         
         # Rank weeks by average performance
@@ -212,27 +327,23 @@ class CopperLMEAnalyzer:
     def _analyze_weekday_patterns(self, df):
         """Analyze patterns by day of week"""
         weekday_stats = []
-        weekday_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-        for day in range(7):
-            day_df = df[df['weekday'] == day]
-            if len(day_df) > 0:
-                # Calculate how often this day beats the monthly average
-                beats_monthly_avg = 0
-                total_comparisons = 0
-                
-                for (year, month), group in day_df.groupby(['year', 'month']):
-                    month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-                    beats_monthly_avg += (group['lme_copper_cash_settlement'] > month_avg).sum()
-                    total_comparisons += len(group)
-                
-                weekday_stats.append({
-                    "weekday": weekday_names[day],
-                    "avg_price": float(day_df['lme_copper_cash_settlement'].mean()),
-                    "std": float(day_df['lme_copper_cash_settlement'].std()),
-                    "count": len(day_df),
-                    "beats_monthly_avg_pct": float(beats_monthly_avg / total_comparisons * 100) if total_comparisons > 0 else 0
-                })
+        
+        # Count how often each day beats the monthly average in the same pass
+        weekdays = df.groupby('weekday').agg(
+            avg_price=('lme_copper_cash_settlement', 'mean'),
+            std=('lme_copper_cash_settlement', 'std'),
+            trading_days=('lme_copper_cash_settlement', 'count'),
+            beats_monthly_avg=('above_month_avg', 'sum')
+        )
+        
+        for day, row in zip(weekdays.index, weekdays.itertuples(index=False)):
+            weekday_stats.append({
+                "weekday": WEEKDAY_NAMES[day],
+                "avg_price": float(row.avg_price),
+                "std": float(row.std),
+                "count": int(row.trading_days),
+                "beats_monthly_avg_pct": float(row.beats_monthly_avg / row.trading_days * 100)
+            })
         
         # Rank days by performance
         weekday_stats.sort(key=lambda x: x['beats_monthly_avg_pct'], reverse=True)
@@ -243,78 +354,58 @@ class CopperLMEAnalyzer:
         """Calculate optimal pricing strategies"""
         strategies = []
         
-        # Strategy 1: Price everything on best day of week
-        best_day = df.groupby('weekday')['lme_copper_cash_settlement'].mean().idxmax()
-        best_day_name = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][best_day]
-        best_day_df = df[df['weekday'] == best_day]
+        # Weekday averages drive strategies 1, 2 and 4; compute them once
+        weekday_means = df.groupby('weekday')['lme_copper_cash_settlement'].mean()
+        best_day = int(weekday_means.idxmax())
+        best_2_days = weekday_means.nlargest(2).index.tolist()
+        worst_day = int(weekday_means.idxmin())
+        weekdays = df['weekday']
         
-        strategy1_performance = []
-        for (year, month), group in best_day_df.groupby(['year', 'month']):
-            month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-            if len(group) > 0:
-                strategy1_performance.append((group['lme_copper_cash_settlement'].mean() / month_avg - 1) * 100)
+        # Strategy 1: Price everything on best day of week
+        best_day_name = WEEKDAY_NAMES[best_day]
+        avg_performance, success_rate = self._strategy_performance(df, weekdays == best_day)
         
         strategies.append({
             "name": f"Single Day Strategy (All on {best_day_name})",
             "description": f"Price 100% of quantity on {best_day_name}",
-            "avg_performance_vs_monthly": float(np.mean(strategy1_performance)) if strategy1_performance else 0,
-            "success_rate": float(sum(p > 0 for p in strategy1_performance) / len(strategy1_performance) * 100) if strategy1_performance else 0,
+            "avg_performance_vs_monthly": avg_performance,
+            "success_rate": success_rate,
             "risk_level": "High"
         })
         
         # Strategy 2: Spread across best 2 days
-        best_2_days = df.groupby('weekday')['lme_copper_cash_settlement'].mean().nlargest(2).index.tolist()
-        best_2_names = [['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][d] for d in best_2_days]
-        best_2_df = df[df['weekday'].isin(best_2_days)]
-        
-        strategy2_performance = []
-        for (year, month), group in best_2_df.groupby(['year', 'month']):
-            month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-            if len(group) > 0:
-                strategy2_performance.append((group['lme_copper_cash_settlement'].mean() / month_avg - 1) * 100)
+        best_2_names = WEEKDAY_NAMES[best_2_days]
+        avg_performance, success_rate = self._strategy_performance(df, weekdays.isin(best_2_days))
         
         strategies.append({
             "name": f"Two-Day Split Strategy ({', '.join(best_2_names)})",
             "description": f"Price 50% each on {' and '.join(best_2_names)}",
-            "avg_performance_vs_monthly": float(np.mean(strategy2_performance)) if strategy2_performance else 0,
-            "success_rate": float(sum(p > 0 for p in strategy2_performance) / len(strategy2_performance) * 100) if strategy2_performance else 0,
+            "avg_performance_vs_monthly": avg_performance,
+            "success_rate": success_rate,
             "risk_level": "Medium"
         })
         
         # Strategy 3: Week-based strategy
         best_week = df.groupby('week_of_month')['lme_copper_cash_settlement'].mean().idxmax()
-        best_week_df = df[df['week_of_month'] == best_week]
-        
-        strategy3_performance = []
-        for (year, month), group in best_week_df.groupby(['year', 'month']):
-            month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-            if len(group) > 0:
-                strategy3_performance.append((group['lme_copper_cash_settlement'].mean() / month_avg - 1) * 100)
+        avg_performance, success_rate = self._strategy_performance(df, df['week_of_month'] == best_week)
         
         strategies.append({
             "name": f"Week {best_week} Focus Strategy",
             "description": f"Price 70% in Week {best_week}, 30% spread across other weeks",
-            "avg_performance_vs_monthly": float(np.mean(strategy3_performance) * 0.7) if strategy3_performance else 0,
-            "success_rate": float(sum(p > 0 for p in strategy3_performance) / len(strategy3_performance) * 100) if strategy3_performance else 0,
+            "avg_performance_vs_monthly": avg_performance * 0.7,
+            "success_rate": success_rate,
             "risk_level": "Medium"
         })
         
         # Strategy 4: Avoid worst days
-        worst_day = df.groupby('weekday')['lme_copper_cash_settlement'].mean().idxmin()
-        avoid_day_df = df[df['weekday'] != worst_day]
+        avg_performance, success_rate = self._strategy_performance(df, weekdays != worst_day)
         
-        strategy4_performance = []
-        for (year, month), group in avoid_day_df.groupby(['year', 'month']):
-            month_avg = df[(df['year'] == year) & (df['month'] == month)]['lme_copper_cash_settlement'].mean()
-            if len(group) > 0:
-                strategy4_performance.append((group['lme_copper_cash_settlement'].mean() / month_avg - 1) * 100)
-        
-        worst_day_name = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][worst_day]
+        worst_day_name = WEEKDAY_NAMES[worst_day]
         strategies.append({
             "name": f"Avoid {worst_day_name} Strategy",
             "description": f"Spread pricing equally across all days except {worst_day_name}",
-            "avg_performance_vs_monthly": float(np.mean(strategy4_performance)) if strategy4_performance else 0,
-            "success_rate": float(sum(p > 0 for p in strategy4_performance) / len(strategy4_performance) * 100) if strategy4_performance else 0,
+            "avg_performance_vs_monthly": avg_performance,
+            "success_rate": success_rate,
             "risk_level": "Low"
         })
         
@@ -323,33 +414,51 @@ class CopperLMEAnalyzer:
         
         return strategies
     
+    def _strategy_performance(self, df, mask):
+        """Average performance vs monthly average (%) and success rate for the days selected by mask"""
+        performance = self._performance_vs_month(df, mask)
+        if len(performance) == 0:
+            return 0, 0
+        
+        return float(performance.mean()), float((performance > 0).mean() * 100)
+    
+    def _performance_vs_month(self, df, mask):
+        """Per-month performance (%) of the days selected by mask against the monthly average"""
+        monthly = df[mask].groupby('ym').agg(
+            price=('lme_copper_cash_settlement', 'mean'),
+            month_avg=('month_avg', 'first')
+        )
+        # Widen before dividing: the ratio sits close to 1, where float32 loses the signal
+        price = monthly['price'].to_numpy(dtype=np.float64)
+        month_avg = monthly['month_avg'].to_numpy(dtype=np.float64)
+        return (price / month_avg - 1) * 100
+    
     def _analyze_trends(self, df):
-        """Analyze price trends and cycles"""
-        # Calculate moving averages
-        df_sorted = df.sort_values('date').copy()
-        df_sorted['ma_7'] = df_sorted['lme_copper_cash_settlement'].rolling(window=7, min_periods=1).mean()
-        df_sorted['ma_30'] = df_sorted['lme_copper_cash_settlement'].rolling(window=30, min_periods=1).mean()
-        df_sorted['ma_90'] = df_sorted['lme_copper_cash_settlement'].rolling(window=90, min_periods=1).mean()
-        
-        # Trend direction
-        recent_trend = "Upward" if df_sorted['ma_30'].iloc[-1] > df_sorted['ma_30'].iloc[-30] else "Downward"
-        
-        # Calculate year-over-year growth
-        yoy_growth = []
-        for year in df['year'].unique():
-            if year > df['year'].min():
-                curr_year_avg = df[df['year'] == year]['lme_copper_cash_settlement'].mean()
-                prev_year_avg = df[df['year'] == year - 1]['lme_copper_cash_settlement'].mean()
-                yoy_growth.append({
-                    "year": int(year),
-                    "growth_pct": float((curr_year_avg / prev_year_avg - 1) * 100)
-                })
+        """Analyze price trends and cycles; the trend compares the last 30 records with up to 30 before them"""
+        # Current moving averages only need the tail (data is already sorted by date in load_data)
+        prices = df['lme_copper_cash_settlement']
+        ma_7_current = prices.iloc[-7:].mean()
+        ma_30_current = prices.iloc[-30:].mean()
+        ma_90_current = prices.iloc[-90:].mean()
+        
+        # Trend direction; periods of 30 records or fewer have no earlier window to compare with
+        if len(prices) <= 30:
+            recent_trend = "Insufficient data"
+        else:
+            recent_trend = "Upward" if ma_30_current > prices.iloc[-60:-30].mean() else "Downward"
         
-        # Identify cycles (simplified approach using peak detection)
-        from scipy.signal import find_peaks
+        # Calculate year-over-year growth against the preceding calendar year
+        year_means = df.groupby('year')['lme_copper_cash_settlement'].mean()
+        prev_year_means = year_means.reindex(year_means.index - 1).to_numpy()
+        growth_pct = (year_means.to_numpy() / prev_year_means - 1) * 100
+        yoy_growth = [
+            {"year": int(year), "growth_pct": float(growth)}
+            for year, growth in zip(year_means.index[1:], growth_pct[1:])
+        ]
         
-        # Use monthly averages for cycle detection
-        monthly_avg = df.groupby(['year', 'month'])['lme_copper_cash_settlement'].mean().values
+        # Identify cycles (simplified approach using peak detection)
+        # Use monthly averages for cycle detection, as one contiguous float32 buffer
+        monthly_avg = df.groupby('ym')['lme_copper_cash_settlement'].mean().to_numpy(dtype=np.float32)
         peaks, _ = find_peaks(monthly_avg, distance=3)
         troughs, _ = find_peaks(-monthly_avg, distance=3)
         
@@ -357,9 +466,9 @@ class CopperLMEAnalyzer:
         
         return {
             "current_trend": recent_trend,
-            "ma_7_current": float(df_sorted['ma_7'].iloc[-1]),
-            "ma_30_current": float(df_sorted['ma_30'].iloc[-1]),
-            "ma_90_current": float(df_sorted['ma_90'].iloc[-1]),
+            "ma_7_current": float(ma_7_current),
+            "ma_30_current": float(ma_30_current),
+            "ma_90_current": float(ma_90_current),
             "yoy_growth": yoy_growth,
             "cycle_info": {
                 "peaks_detected": len(peaks),
@@ -370,12 +479,11 @@ class CopperLMEAnalyzer:
     
     def _analyze_volatility(self, df):
         """Analyze price volatility"""
-        # Calculate daily returns
-        df_sorted = df.sort_values('date').copy()
-        df_sorted['daily_return'] = df_sorted['lme_copper_cash_settlement'].pct_change()
+        # Calculate daily returns (data is already sorted by date in load_data)
+        daily_return = df['lme_copper_cash_settlement'].pct_change()
         
         # Monthly volatility
-        monthly_vol = df.groupby(['year', 'month'])['lme_copper_cash_settlement'].std()
+        monthly_vol = df.groupby('ym')['lme_copper_cash_settlement'].std()
         
         # Volatility by day of week
         weekday_vol = df.groupby('weekday')['lme_copper_cash_settlement'].std()
@@ -386,31 +494,36 @@ class CopperLMEAnalyzer:
         return {
             "overall_volatility": float(df['lme_copper_cash_settlement'].std()),
             "daily_return_stats": {
-                "mean": float(df_sorted['daily_return'].mean() * 100) if not df_sorted['daily_return'].isna().all() else 0,
-                "std": float(df_sorted['daily_return'].std() * 100) if not df_sorted['daily_return'].isna().all() else 0,
-                "max": float(df_sorted['daily_return'].max() * 100) if not df_sorted['daily_return'].isna().all() else 0,
-                "min": float(df_sorted['daily_return'].min() * 100) if not df_sorted['daily_return'].isna().all() else 0
+                "mean": float(daily_return.mean() * 100) if not daily_return.isna().all() else 0,
+                "std": float(daily_return.std() * 100) if not daily_return.isna().all() else 0,
+                "max": float(daily_return.max() * 100) if not daily_return.isna().all() else 0,
+                "min": float(daily_return.min() * 100) if not daily_return.isna().all() else 0
             },
-            "most_volatile_month": int(monthly_vol.idxmax()[1]) if len(monthly_vol) > 0 else 0,
-            "least_volatile_month": int(monthly_vol.idxmin()[1]) if len(monthly_vol) > 0 else 0,
+            "most_volatile_month": divmod(int(monthly_vol.idxmax()), 13)[1] if len(monthly_vol) > 0 else 0,
+            "least_volatile_month": divmod(int(monthly_vol.idxmin()), 13)[1] if len(monthly_vol) > 0 else 0,
             "most_volatile_weekday": int(weekday_vol.idxmax()) if len(weekday_vol) > 0 else 0,
             "most_volatile_week": int(week_vol.idxmax()) if len(week_vol) > 0 else 0
         }
     
-    def save_results(self, results, output_filename='analysis_results.json'):
-        """Save analysis results to JSON file"""
+    def save_results(self, results, output_filename='analysis_results.json', backup_filename=None):
+        """Save analysis results to JSON file, serializing once for every destination"""
+        payload = serialize_results(results)
+        
         output_path = OUTPUT_DIR / output_filename
-        with open(output_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        output_path.write_bytes(payload)
         print(f"Results saved to {output_path}")
         
         # Also save in root for HTML dashboard
         root_output = BASE_DIR / 'analysis_results.json'
-        with open(root_output, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        root_output.write_bytes(payload)
         print(f"Dashboard data saved to {root_output}")
+        
+        if backup_filename:
+            backup_path = BACKUP_DIR / backup_filename
+            backup_path.write_bytes(payload)
+            print(f"Backup saved to {backup_path}")
     
-    def run_analysis(self, start_date=None, end_date=None):
+    def run_analysis(self, start_date=None, end_date=None, backup_filename=None):
         """Main method to run the complete analysis"""
         if not self.load_data():
             return None
@@ -429,10 +542,28 @@ class CopperLMEAnalyzer:
         }
         
         # Save results
-        self.save_results(results)
+        self.save_results(results, backup_filename=backup_filename)
         
         return results
 
+def _replace_non_finite(value):
+    """Recursively replace NaN/inf floats with None so they encode as JSON null"""
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    if isinstance(value, (float, np.floating)) and not np.isfinite(value):
+        return None
+    return value
+
+def serialize_results(results):
+    """Encode results as indented JSON bytes, using orjson when it is installed"""
+    # Same null policy on both paths: bare NaN is invalid JSON and breaks the dashboard
+    results = _replace_non_finite(results)
+    if orjson is not None:
+        return orjson.dumps(results, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(results, indent=2, default=str, allow_nan=False).encode()
+
 def scheduled_analysis():
     """Function to run scheduled analysis"""
     print(f"Running scheduled analysis at {datetime.now()}")
@@ -442,36 +573,28 @@ def scheduled_analysis():
     end_date = datetime.now()
     start_date = end_date - timedelta(days=365)
     
-    results = analyzer.run_analysis(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+    # Also save a timestamped version in backups
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_filename = f'analysis_results_{timestamp}.json'
+    
+    results = analyzer.run_analysis(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'),
+                                    backup_filename=backup_filename)
     
     if results:
         print("Analysis completed successfully")
-        # Also save a timestamped version in backups
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f'analysis_results_{timestamp}.json'
-        analyzer.save_results(results, backup_filename)
-        
-        # Save to backup directory
-        backup_path = BACKUP_DIR / backup_filename
-        with open(backup_path, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
-        print(f"Backup saved to {backup_path}")
 
 def main():
     """Main function with options for manual or scheduled runs"""
     import sys
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--schedule':
-        # Schedule the analysis to run daily at 7:30 PM
-        schedule.every().day.at("19:30").do(scheduled_analysis)
-        
-        print("Scheduler started. Analysis will run daily at 7:30 PM")
-        print("Press Ctrl+C to stop")
-        
-        # Keep the script running
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+    if len(sys.argv) > 1 and sys.argv[1] == '--daily':
+        # One-shot daily run; trigger it at 7:30 PM from cron or a systemd timer
+        scheduled_analysis()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--schedule':
+        # The built-in polling scheduler has been replaced by --daily
+        print("The --schedule option has been removed. Schedule 'copper_analysis.py --daily'")
+        print("with cron or a systemd timer instead (see README)")
+        sys.exit(1)
     else:
         # Run analysis immediately
         analyzer = CopperLMEAnalyzer()